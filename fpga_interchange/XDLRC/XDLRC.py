@@ -113,7 +113,8 @@ class XDLRC(DeviceResources):
         """
         return tile.col
 
-    def __init__(self, device_resource, fileName='', family="artix7"):
+    def __init__(self, device_resource, fileName='', family="artix7",
+                 buffering=1 << 20):
         """
         Initialize the XDLRC object.
         Parameters:
@@ -122,6 +123,8 @@ class XDLRC(DeviceResources):
                               interchange_capnp.read_capnp_file() output
             fileName (str)  - Name of file to create/write to.  Can be
                               none for no file operations.
+            buffering (int) - Buffer size of the XDLRC file.  The output
+                              is hundreds of MB, so the default is 1 MiB.
         """
 
         if type(device_resource) is DeviceResources:
@@ -150,13 +153,19 @@ class XDLRC(DeviceResources):
         if fileName is not None:
             if fileName == '':
                 fileName = self.device_resource_capnp.name + ".xdlrc"
-            self.xdlrc = open(fileName, "w+")
+            self.xdlrc = open(fileName, "w+", buffering=buffering)
         else:
             self.xdlrc = DummyFile()
 
         # set family
         self.family = family
 
+        # per tile type (string index, wire name) pairs, see
+        # _get_tile_type_wires()
+        self.tile_type_wires = {}
+        # per tile type rendered pip lines, see _get_tile_type_pips()
+        self.tile_type_pips = {}
+
     def close_file(self):
         self.xdlrc.close()
 
@@ -170,6 +179,45 @@ class XDLRC(DeviceResources):
                     self.xdlrc.write(f" {self.strs[name]}")
                 self.xdlrc.write(f")\n")
 
+    def _get_tile_type_wires(self, tile_type):
+        """
+        Get a tuple of (string index, wire name) pairs for tile_type.
+
+        The pairs are built once per tile type and shared by every tile
+        of that type, so the wire names are only looked up in self.strs
+        once.
+        """
+        wires = self.tile_type_wires.get(tile_type.tile_type_index)
+        if wires is None:
+            wires = tuple((idx, self.strs[idx]) for idx in
+                          tile_type.string_index_to_wire_id_in_tile_type)
+            self.tile_type_wires[tile_type.tile_type_index] = wires
+        return wires
+
+    def _get_tile_type_pips(self, tile_type):
+        """
+        Get a tuple of rendered pip line endings for tile_type.
+
+        Everything on a pip line except the tile name depends only on the
+        tile type, so that part is formatted once per tile type.
+        Bidirectional pips produce one line ending per direction.
+        """
+        pips = self.tile_type_pips.get(tile_type.tile_type_index)
+        if pips is None:
+            wires = tile_type.wires
+            pips = []
+            for p in tile_type.pips:
+                wire0 = self.strs[wires[p.wire0]]
+                wire1 = self.strs[wires[p.wire1]]
+                if p.directional:
+                    pips.append(f"{wire0} -> {wire1})\n")
+                else:
+                    pips.append(f"{wire0} =- {wire1})\n")
+                    pips.append(f"{wire1} =- {wire0})\n")
+            pips = tuple(pips)
+            self.tile_type_pips[tile_type.tile_type_index] = pips
+        return pips
+
     def _generate_tile(self, tile):
         """
         The heavy lifting for generating xdlrc for a tile.
@@ -179,17 +227,20 @@ class XDLRC(DeviceResources):
 
         # Some pointers for abbreviated reference
         raw_repr = self.device_resource_capnp
-        xdlrc = self.xdlrc
+
+        # The tile is rendered into a list and written with a single call
+        # once complete.
+        tile_lines = []
+        write = tile_lines.append
 
         tile_name = self.strs[tile.name]
 
         tile_type = self.get_tile_type(tile.type)
         tile_type_r = raw_repr.tileTypeList[tile_type.tile_type_index]
-        wires = tile_type.wires
         pips = tile_type.pips
         num_sites = len(tile.sites)
-        xdlrc.write(f"\t(tile {tile.row} {tile.col} {tile_name} "
-                    + f"{tile_type.name} {num_sites}\n")
+        write(f"\t(tile {tile.row} {tile.col} {tile_name} "
+              + f"{tile_type.name} {num_sites}\n")
 
         num_wires = 0
         num_pips = len(pips)
@@ -204,16 +255,14 @@ class XDLRC(DeviceResources):
             site_type_r_idx = site_type_in_tile_type.primaryType
             site_type_r = raw_repr.siteTypeList[site_type_r_idx]
             site_t_name = self.strs[site_type_r.name]
-            site = self.site_name_to_site[site_name][site_t_name]
-
-            site_t = self.get_site_type(site.site_type_index)
+            site_t = self.get_site_type(site_type_r_idx)
             # bond = ""
             # if (("IOB" in site_t_name) or ("IPAD" == site_t_name) or
             #         "OPAD" == site_t_name):
             #     bond = "unkown "
             bond = "unknown "  # just mark all sites as unkown for now
-            xdlrc.write(f"\t\t(primitive_site {site_name} {site_t_name} "
-                        + f"{bond}{len(site_t.site_pins.keys())}\n")
+            write(f"\t\t(primitive_site {site_name} {site_t_name} "
+                  + f"{bond}{len(site_t.site_pins.keys())}\n")
 
             # PINWIRE declaration
             # site_pin to tile_wire list
@@ -225,60 +274,61 @@ class XDLRC(DeviceResources):
                 direction = pin[3].name.lower()
                 num_pinwires += 1
                 pin_tile_wires.add(tile_wire)
-                xdlrc.write(f"\t\t\t(pinwire {pin_name} {direction} "
-                            + f"{tile_wire})\n")
-            xdlrc.write(f"\t\t)\n")
+                write(f"\t\t\t(pinwire {pin_name} {direction} "
+                      + f"{tile_wire})\n")
+            write(f"\t\t)\n")
 
         # WIRE declaration
-        tile_wires = set()
-        for idx in tile_type.string_index_to_wire_id_in_tile_type.keys():
-            wire_name = self.strs[idx]
-            try:
-                node_idx = self.node(tile_name, wire_name).node_index
-            except AssertionError as e:
+        # Wires are matched by string index rather than by name; names are
+        # only looked up for the lines actually written.
+        if self.tile_wire_index_to_node_index is None:
+            self.build_node_index()
+        wire_to_node = self.tile_wire_index_to_node_index
+
+        for idx, wire_name in self._get_tile_type_wires(tile_type):
+            node_idx = wire_to_node.get((tile.name, idx))
+            if node_idx is None:
                 continue
             myNode = raw_repr.nodes[node_idx]
 
             num_wires += 1
-            tile_wires.add(wire_name)
-            xdlrc.write(f"\t\t(wire {wire_name} {len(myNode.wires) -1}")
+            if pin_tile_wires:
+                # Declared here, so not a pinwire-only wire
+                pin_tile_wires.discard(wire_name)
+            write(f"\t\t(wire {wire_name} {len(myNode.wires) -1}")
 
             if len(myNode.wires) == 1:  # no CONNs
-                xdlrc.write(')\n')
+                write(')\n')
                 continue
             else:
-                xdlrc.write('\n')
+                write('\n')
 
             # CONN declaration
             for w in myNode.wires:
                 wire = raw_repr.wires[w]
-                conn_tile = self.strs[wire.tile]
-                conn_wire = self.strs[wire.wire]
 
-                if (conn_wire != wire_name) or (conn_tile != tile_name):
-                    xdlrc.write(f"\t\t\t(conn {conn_tile} {conn_wire})\n")
+                if (wire.wire != idx) or (wire.tile != tile.name):
+                    write(f"\t\t\t(conn {self.strs[wire.tile]} "
+                          + f"{self.strs[wire.wire]})\n")
 
-            xdlrc.write(f"\t\t)\n")
+            write(f"\t\t)\n")
 
-        for wire in (pin_tile_wires - tile_wires):
+        # Pinwire tile wires without a node still need a declaration.
+        # Tiles without sites have none, so nothing is tracked for them.
+        for wire in pin_tile_wires:
             num_wires += 1
-            xdlrc.write(f"\t\t(wire {wire} {0})\n")
+            write(f"\t\t(wire {wire} {0})\n")
 
         # PIP declaration
-        for p in pips:
-            if p.directional:
-                xdlrc.write(f"\t\t(pip {tile_name} {self.strs[wires[p.wire0]]}"
-                            + f" -> {self.strs[wires[p.wire1]]})\n")
-            else:
-                xdlrc.write(f"\t\t(pip {tile_name} {self.strs[wires[p.wire0]]}"
-                            + f" =- {self.strs[wires[p.wire1]]})\n")
-                xdlrc.write(f"\t\t(pip {tile_name} {self.strs[wires[p.wire1]]}"
-                            + f" =- {self.strs[wires[p.wire0]]})\n")
+        pip_prefix = f"\t\t(pip {tile_name} "
+        for pip_tail in self._get_tile_type_pips(tile_type):
+            write(pip_prefix + pip_tail)
 
         # TILE_SUMMARY declaration
-        xdlrc.write(f"\t\t(tile_summary {tile_name} {tile_type.name} ")
-        xdlrc.write(f"{num_pinwires} {num_wires} {num_pips})\n")
-        xdlrc.write(f"\t)\n")
+        write(f"\t\t(tile_summary {tile_name} {tile_type.name} ")
+        write(f"{num_pinwires} {num_wires} {num_pips})\n")
+        write(f"\t)\n")
+        self.xdlrc.write(''.join(tile_lines))
         return (num_sites, num_pips, num_pinwires)
 
     def generate_tile(self, tile_name):
@@ -287,10 +337,10 @@ class XDLRC(DeviceResources):
 
         Returns a tuple(num_sites, num_pips)
         """
-        for tile in self.tiles:
-            name = self.strs[tile.name]
-            if name == tile_name:
-                return self._generate_tile(tile)
+        tile = self.tile_name_to_tile.get(tile_name)
+        if tile is not None:
+            return self._generate_tile(
+                self.device_resource_capnp.tileList[tile.tile_index])
 
     def generate_prim_defs(self):
         """Generate the primitive_defs."""
@@ -317,17 +367,21 @@ class XDLRC(DeviceResources):
             site_t_r = raw_repr.siteTypeList[site_t.site_type_index]
             site_wires = site_t_r.siteWires
 
-            xdlrc.write(f"\t(primitive_def {site_t.site_type} "
-                        + f"{len(site_t.site_pins)} {len(site_t.bels)}\n")
+            # Each primitive_def goes to the file in a single write
+            prim_def_lines = []
+            write = prim_def_lines.append
+
+            write(f"\t(primitive_def {site_t.site_type} "
+                  + f"{len(site_t.site_pins)} {len(site_t.bels)}\n")
             # PIN declaration
             for pin_name, pin in site_t.site_pins.items():
                 direction = pin[3].name.lower()
-                xdlrc.write(
+                write(
                     f"\t\t(pin {pin_name} {pin_name} {direction})\n")
 
             # ELEMENT declaration
             for bel in site_t.bels:
-                xdlrc.write(f"\t\t(element {bel.name} {len(bel.bel_pins)}\n")
+                write(f"\t\t(element {bel.name} {len(bel.bel_pins)}\n")
 
                 # 1 is the enum for routing
                 add_cfg = [] if (bel.category == 1) else None
@@ -340,11 +394,11 @@ class XDLRC(DeviceResources):
                     bel_info = site_t.bel_pins[bel_pin_index]
                     direction = bel_info[2].name.lower()
                     if direction == 'inout' or direction == 'input':
-                        xdlrc.write(f"\t\t\t(pin {bel_pin_name} input)\n")
+                        write(f"\t\t\t(pin {bel_pin_name} input)\n")
                         if add_cfg is not None:
                             add_cfg.append(bel_pin_name)
                     else:
-                        xdlrc.write(f"\t\t\t(pin {bel_pin_name} output)\n")
+                        write(f"\t\t\t(pin {bel_pin_name} output)\n")
 
                     # CONN declaration
                     site_wire_index = bel_info[1]
@@ -369,34 +423,35 @@ class XDLRC(DeviceResources):
                                 bel_pin2_r.dir).name.lower()
                             if not direction:
                                 if direction2 == 'input':
-                                    xdlrc.write(f"\t\t\t(conn {bel.name} "
-                                                + f"{bel_pin_name} ==> "
-                                                + f"{bel2_name} "
-                                                + f"{bel_pin2_name})\n")
+                                    write(f"\t\t\t(conn {bel.name} "
+                                          + f"{bel_pin_name} ==> "
+                                          + f"{bel2_name} "
+                                          + f"{bel_pin2_name})\n")
                                 elif direction2 == 'inout':
-                                    xdlrc.write(f"\t\t\t(conn {bel.name} "
-                                                + f"{bel_pin_name} <== "
-                                                + f"{bel2_name} "
-                                                + f"{bel_pin2_name})\n")
-                                    xdlrc.write(f"\t\t\t(conn {bel.name} "
-                                                + f"{bel_pin_name} ==> "
-                                                + f"{bel2_name} "
-                                                + f"{bel_pin2_name})\n")
+                                    write(f"\t\t\t(conn {bel.name} "
+                                          + f"{bel_pin_name} <== "
+                                          + f"{bel2_name} "
+                                          + f"{bel_pin2_name})\n")
+                                    write(f"\t\t\t(conn {bel.name} "
+                                          + f"{bel_pin_name} ==> "
+                                          + f"{bel2_name} "
+                                          + f"{bel_pin2_name})\n")
                                 else:
-                                    xdlrc.write(f"\t\t\t(conn {bel.name} "
-                                                + f"{bel_pin_name} <== "
-                                                + f"{bel2_name} "
-                                                + f"{bel_pin2_name})\n")
+                                    write(f"\t\t\t(conn {bel.name} "
+                                          + f"{bel_pin_name} <== "
+                                          + f"{bel2_name} "
+                                          + f"{bel_pin2_name})\n")
                             elif direction2 != direction:
-                                xdlrc.write(f"\t\t\t(conn {bel.name} "
-                                            + f"{bel_pin_name} "
-                                            + f"{direction_str} {bel2_name}"
-                                            + f" {bel_pin2_name})\n")
+                                write(f"\t\t\t(conn {bel.name} "
+                                      + f"{bel_pin_name} "
+                                      + f"{direction_str} {bel2_name}"
+                                      + f" {bel_pin2_name})\n")
                 if add_cfg is not None:
-                    xdlrc.write(
+                    write(
                         f"\t\t\t(cfg {' '.join(e for e in add_cfg)})\n")
-                xdlrc.write(f"\t\t)\n")
-            xdlrc.write(f"\t)\n")
+                write(f"\t\t)\n")
+            write(f"\t)\n")
+            xdlrc.write(''.join(prim_def_lines))
         xdlrc.write(f")\n")
 
     def generate_XDLRC(self):
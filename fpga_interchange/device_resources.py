@@ -658,11 +658,8 @@ class DeviceResources():
 
     def __init__(self, device_resource_capnp):
         self.device_resource_capnp = device_resource_capnp
-        self.strs = [s for s in self.device_resource_capnp.strList]
-
-        self.string_index = {}
-        for idx, s in enumerate(self.strs):
-            self.string_index[s] = idx
+        self.strs = list(self.device_resource_capnp.strList)
+        self.string_index = dict(zip(self.strs, range(len(self.strs))))
 
         self.site_types = {}
         self.tile_types = {}
@@ -743,26 +740,30 @@ class DeviceResources():
 
     def get_site_type(self, site_type_index):
         """ Get SiteType object for specified site type index. """
-        if site_type_index not in self.site_types:
-            self.site_types[site_type_index] = SiteType(
+        site_type = self.site_types.get(site_type_index)
+        if site_type is None:
+            site_type = SiteType(
                 self.strs,
                 self.device_resource_capnp.siteTypeList[site_type_index],
                 site_type_index)
+            self.site_types[site_type_index] = site_type
 
-        return self.site_types[site_type_index]
+        return site_type
 
     def get_tile_type(self, tile_type_index):
         """ Get TileType object for specified tile type index. """
-        if tile_type_index not in self.tile_types:
+        tile_type = self.tile_types.get(tile_type_index)
+        if tile_type is None:
             num_tile_types = len(self.device_resource_capnp.tileTypeList)
             assert tile_type_index < num_tile_types, (tile_type_index,
                                                       num_tile_types)
-            self.tile_types[tile_type_index] = TileType(
+            tile_type = TileType(
                 self.strs,
                 self.device_resource_capnp.tileTypeList[tile_type_index],
                 tile_type_index)
+            self.tile_types[tile_type_index] = tile_type
 
-        return self.tile_types[tile_type_index]
+        return tile_type
 
     def get_tile_name_at_site_name(self, site_name):
         """ Get Tile name at site name. """
@@ -771,7 +772,7 @@ class DeviceResources():
 
         # Get the first site in the dict. Assume all alternative sites are at
         # the same tile
-        site = list(sites_dict.values())[0]
+        site = next(iter(sites_dict.values()))
         return self.strs[site.tile_name_index]
 
     def bel_pin(self, site_name, site_type, bel, pin):
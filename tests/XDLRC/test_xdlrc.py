@@ -24,13 +24,29 @@ XDLRC_Exceptions.txt.
 """
 
 from collections import namedtuple, OrderedDict
-import debugpy
 import enum
+import gzip
+import io
+import mmap
+import multiprocessing
+import os
+import re
+import shutil
 import sys
 import time
 import json
+
+# Treat orjson as an optional dependency, it parses the large Vivado
+# databases considerably faster than json.
+try:
+    import orjson as _orjson
+    ORJSON_INSTALLED = True
+except ImportError:
+    ORJSON_INSTALLED = False
+
 from fpga_interchange.XDLRC.XDLRC import XDLRC
-from fpga_interchange.interchange_capnp import Interchange, read_capnp_file
+from fpga_interchange.interchange_capnp import Interchange, read_capnp_file, \
+    CompressionFormat
 
 ############################## Convenient Constants ###########################
 TEST_XDLRC = 'xc7a100t.xdlrc'
@@ -46,10 +62,10 @@ DEVICE_FILE = "/home/reilly/xc7a100t.device"
 #    "sites":site_list}
 #    }
 VIVADO_INFO = "/home/reilly/xc7a100tcsg324_info.json"
-# Filename of JSON with a list (not comprehensive) of nodeless wires in Vivado.
-VIVADO_NODELESS_WIRES = "/home/reilly/xc7a100tcsg324_nodeless_wires.json"
 # Namve of file containing output tcl array of possible nodeless wires.
 TCL_FILE_OUT = "WireArray.tcl"
+# Buffer size of the output files, which receive many small writes.
+OUT_BUFFER_SIZE = 1 << 20
 ###############################################################################
 
 KeyWords = namedtuple('KeyWords', 'comment tiles tile wire conn summary pip site pinwire prim_defs prim_def element cfg pin header tile_summary')  # noqa
@@ -62,6 +78,9 @@ XDLRC_KEY_WORD = {'#': 0, 'TILES': 3, 'TILE': 6, 'WIRE': 3, 'CONN': 6,
                   'ELEMENT': 3, 'CFG': 0, 'PIN': 4, 'XDL_RESOURCE_REPORT': 0,
                   'SUMMARY': 6}
 
+# Padding for lines shorter than their expected token length
+BLANK_TOKENS = ('BLANK',) * max(XDLRC_KEY_WORD.values())
+
 XDLRC_UNSUPPORTED_WORDS = ['UNBONDED', '_ROUTETHROUGH']
 
 XDLRC_KEY_WORD_KEYS = KeyWords(comment='#', tiles='TILES', tile='TILE',
@@ -79,13 +98,14 @@ class Vivado():
     Handles Vivado data and tcl file output.
 
     Class Attributes:
-    info            -   VIVADO_INFO loaded into memory.
-    nodeless_wires  -   NODELESS_WIRES loaded into memory.
+    info            -   VIVADO_INFO loaded into memory. Each tile's pips
+                        are stored as a frozenset of (wire0, wire1), its
+                        wires as a frozenset of names without the tile
+                        prefix, and its sites as a frozenset.
     TCL_F           -   File handle for TCL_FILE_OUT.
     """
 
     info = {}
-    nodeless_wires = {}
     TCL_F = None
 
     def tcl_print(self, tcl):
@@ -94,14 +114,33 @@ class Vivado():
 
     def setup(self):
         """Load the files only once"""
-        with open(VIVADO_NODELESS_WIRES, "r") as f:
-            Vivado.nodeless_wires = json.load(f)
-        with open(VIVADO_INFO, "r") as f:
-            Vivado.info = json.load(f)
-        Vivado.TCL_F = open(TCL_FILE_OUT, "w")
+        info = Vivado._load_json(VIVADO_INFO)
+
+        # Convert the lists once so the checks below are hash lookups
+        intern = sys.intern
+        for tile, tile_info in info.items():
+            prefix = tile + '/'
+            tile_info["pips"] = frozenset(
+                tuple(map(intern, pip.split(' ', 1)))
+                for pip in tile_info["pips"])
+            tile_info["wires"] = frozenset(
+                intern(wire[len(prefix):]) for wire in tile_info["wires"]
+                if wire.startswith(prefix))
+            tile_info["sites"] = frozenset(map(intern, tile_info["sites"]))
+        Vivado.info = info
+        Vivado.TCL_F = open(TCL_FILE_OUT, "w", buffering=OUT_BUFFER_SIZE)
         Vivado.TCL_F.write('array set testWires {')
         Vivado.tcl_print = Vivado._tcl_print_first
 
+    @staticmethod
+    def _load_json(file_name):
+        """Load a JSON file, with orjson if it is installed"""
+        if ORJSON_INSTALLED:
+            with open(file_name, "rb") as f:
+                return _orjson.loads(f.read())
+        with open(file_name, "r") as f:
+            return json.load(f)
+
     def _tcl_print_first(self, tcl):
         Vivado.TCL_F.write(tcl)
         Vivado.tcl_print = Vivado._tcl_print_next
@@ -111,15 +150,15 @@ class Vivado():
 
     def pip(self, tile, wire0, wire1):
         """Check if pip exists in Vivado"""
-        return (f"{wire0} {wire1}" in Vivado.info[tile]["pips"])
+        return ((wire0, wire1) in Vivado.info[tile]["pips"])
 
     def wire(self, tile, wire):
         """Check if wire exists in Vivado"""
-        return (f"{tile}/{wire}" in Vivado.info[tile]["wires"])
+        return (wire in Vivado.info[tile]["wires"])
 
     def site(self, tile, site):
         """Check if site exists in Vivado"""
-        return (f"{site}" in Vivado.info[tile]["sites"])
+        return (site in Vivado.info[tile]["sites"])
 
     def cleanup(self):
         Vivado.TCL_F.write("}\n")
@@ -132,37 +171,38 @@ class ErrorHandle():
 
     Class Attributes:
     errors              -   Current error count.
-    unknowns            -   Record of encountered unkown key words.
+    unknowns            -   Record of encountered unkown key words, a
+                            dict used as an insertion ordered set.
     XDLRC_ERRORS        -   Name of file to store error messages.
     error_f             -   File Handle for XDLRC_Errors.
     XDLRC_EXCEPTIONS    -   Name of file to store exception messages.
     exception_f         -   File Handle for XDLRC_EXCEPTIONS.
     """
 
-    _header = ""
     errors = 0
-    unknowns = []
+    unknowns = {}
     XDLRC_Errors = "XDLRC_ERRORS.txt"
     error_f = None
     XDLRC_Exceptions = "XDLRC_Exceptions.txt"
     exception_f = None
 
     def setup(self):
-        ErrorHandle.error_f = open(ErrorHandle.XDLRC_Errors, "w")
-        ErrorHandle.exception_f = open(ErrorHandle.XDLRC_Exceptions, "w")
+        ErrorHandle.error_f = open(ErrorHandle.XDLRC_Errors, "w",
+                                   buffering=OUT_BUFFER_SIZE)
+        ErrorHandle.exception_f = open(ErrorHandle.XDLRC_Exceptions, "w",
+                                       buffering=OUT_BUFFER_SIZE)
         ErrorHandle.exception_f.write(
             "Line numbers are expressed CORRECT_XDLRC:TEST_XDLRC\n"
             + "Some errors are not applicable to both files. These are "
             + "expressed with the appropriate side of the colon empty.\n"
             + "See XDLRC.py for further explanation of file contents\n\n\n")
 
-    def err_print(self, str_in):
+    def err_print(self, str_in, header=""):
         ErrorHandle.errors += 1
-        ErrorHandle.error_f.write(f"{ErrorHandle._header} {str_in}\n")
+        ErrorHandle.error_f.write(f"{header} {str_in}\n")
 
-    def ex_print(self, exception, str_in):
-        ErrorHandle.exception_f.write(
-            f"{exception} {ErrorHandle._header} {str_in}\n")
+    def ex_print(self, exception, str_in, header=""):
+        ErrorHandle.exception_f.write(f"{exception} {header} {str_in}\n")
 
     def cleanup(self):
         ErrorHandle.error_f.write(
@@ -171,18 +211,33 @@ class ErrorHandle():
         ErrorHandle.exception_f.close()
 
 
+# Vivado and ErrorHandle only hold class attributes, so a single shared
+# instance of each is used instead of constructing one on every call.
+vivado = Vivado()
+err = ErrorHandle()
+
+
 def file_init(*argv):
     """
     Add line counting and get_line storage to file objects.
-    Adds two members to file:
+    Adds three members to file:
         line_num (int)  - Current line number
         line     (list) - Output of get_line()
+        mm       (mmap) - Read-only map of the whole file, positioned at
+                          the next unread line
     Note: get_line is called to initialize line.
     """
 
     for f in argv:
         f.line_num = 0
         f.line = []
+        if f.seek(0, 2) == 0:
+            # mmap cannot map an empty file, an empty stream reads the same
+            f.mm = io.BytesIO()
+        else:
+            f.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                f.mm.madvise(mmap.MADV_SEQUENTIAL)
     get_line(*argv)
 
 
@@ -196,47 +251,56 @@ def get_line(*argv):
     list of unrecognized XDLRC key words.
     Updates f.line_num to contain current line number.
     Updates f.line to contain the result
+    Lines are read from f.mm rather than from f itself.
     Parameters:
         Any number of (XDLRC) file objects.
     """
-    err = ErrorHandle()
-    ErrorHandle._header = ""
+    # Bound locally, this loop runs once per line of both files
+    key_words = XDLRC_KEY_WORD
+    comment = XDLRC_KEY_WORD_KEYS.comment
+    header = XDLRC_KEY_WORD_KEYS.header
+    intern = sys.intern
     for f in argv:
         line = []
+        readline = f.mm.readline
         while True:
-            line = f.readline()
+            line = readline()
             if not line:
                 # EOF is reached in this file. end of parse
+                line = []
                 print(f"file reached EOF\n\n")
                 if ErrorHandle.unknowns:
-                    print(ErrorHandle.unknowns)
+                    print(list(ErrorHandle.unknowns))
                 break
 
             # keep track of line numbers
             f.line_num += 1
 
-            line = line.strip("()\n\t ")
+            line = line.strip(b"()\r\n\t ")
             if not line:
                 continue
-            line = line.upper().split()
+            # Names repeat heavily across tiles, so interning lets the
+            # set and dict compares in __eq__ short-circuit on identity
+            line = list(map(intern, line.upper().decode().split()))
             key_word = line[0]
-            if (key_word not in XDLRC_KEY_WORD_KEYS
-                    and key_word[0] != XDLRC_KEY_WORD_KEYS.comment):
+            if key_word[0] == comment:
+                continue
+
+            # One lookup both recognizes the key word and gives its length
+            expected_len = key_words.get(key_word)
+            if expected_len is None:
                 if line[0] not in ErrorHandle.unknowns:
                     print(f"Warning: Unknown Key word {line[0]}. Ignoring line"
                           + f" {f.line_num}")
                     print(line)
-                    ErrorHandle.unknowns.append(line[0])
+                    ErrorHandle.unknowns[line[0]] = None
                 continue
 
-            elif (key_word[0] != XDLRC_KEY_WORD_KEYS.comment and
-                  key_word != XDLRC_KEY_WORD_KEYS.header):
+            elif key_word != header:
 
                 # Make sure token is appropriate length
-                expected_len = XDLRC_KEY_WORD[line[0]]
-                actual_len = len(line)
-                if actual_len < expected_len:
-                    line += ['BLANK'] * (expected_len - actual_len)
+                if len(line) < expected_len:
+                    line += BLANK_TOKENS[len(line):expected_len]
                 break
 
         # f.line is updated specifically in this way (NOT with =) to
@@ -247,60 +311,54 @@ def get_line(*argv):
 
 def assert_equal(obj1, obj2):
     """
-    Run assert for equality on two objects.
-    Catches AssertionError and prints it. Returns a bool of (obj1 == obj2)
+    Check two objects for equality.
+    Prints an AssertionError message if they differ. Returns a bool of
+    (obj1 == obj2)
     """
 
-    try:
-        assert obj1 == obj2
-    except AssertionError as e:
-        err = ErrorHandle()
-        ErrorHandle._header = ""
-        err.err_print(
-            f"AssertionError caught.\nObj1:\n{obj1}\nObj2:\n{obj2}\n\n")
-        return False
-    return True
-
-
-class Direction(enum.Enum):
-    """ Enumeration for direction values. """
+    if obj1 == obj2:
+        return True
+    err.err_print(
+        f"AssertionError caught.\nObj1:\n{obj1}\nObj2:\n{obj2}\n\n")
+    return False
+
+
+class Direction(enum.IntEnum):
+    """
+    Enumeration for direction values.
+    direction_from_str() converts XDLRC direction strings.
+    An IntEnum so PinWire hashing and equality use the C int slots
+    rather than Enum's Python level __hash__.
+    """
     Input = 0
     Output = 1
     Inout = 2
 
-    def convert(input_str):
-        input_str = input_str.upper()
-        if input_str == 'INPUT':
-            return Direction.Input
-        elif input_str == 'OUTPUT':
-            return Direction.Output
-        elif input_str == 'INOUT':
-            return Direction.Inout
-        else:
-            return None
+
+# Direction of each XDLRC direction string
+DIRECTIONS = {'INPUT': Direction.Input, 'OUTPUT': Direction.Output,
+              'INOUT': Direction.Inout}
+
+
+def direction_from_str(s):
+    """
+    Return the Direction of an upper case XDLRC direction string, or None
+    if it is not one. get_line() has already upper cased every token, so
+    this is a plain dict lookup.
+    """
+    return DIRECTIONS.get(s)
 
 
 class PinWire(namedtuple('PinWire', 'name direction wire')):
     """
     Lightweight class for holding XDLRC pinwire information.
-    __eq__() has been overridden for accurate comparisons.
-    __hash__() is overridden so PinWire can be in a set.
+    Compares and hashes as a plain tuple, so PinWire can be in a set.
     Members:
         name  (str)       - Name of the pin.
         direction (Direction) - Direction of the pin.
         wire      (str)       - Name of the connecting wire.
     """
 
-    def __hash__(self):
-        return hash(tuple([self.name, self.direction, self.wire]))
-
-    def __eq__(self, other):
-        if type(other) != type(self):
-            return False
-        return ((self.name == other.name)
-                and (self.direction == other.direction)
-                and (self.wire == other.wire))
-
 
 class TileStruct(namedtuple('TileStruct', 'name type wires pips sites')):
     """
@@ -311,11 +369,11 @@ class TileStruct(namedtuple('TileStruct', 'name type wires pips sites')):
         name  (str)         - Tile name
         type  (str)         - Tile type
         wires (dict)        - Key: Wire Name (str)
-                              Value: Associated conns (list of tuples)
+                              Value: Associated conns (frozenset of tuples)
         pips  (dict)        - Key: Input Wire Name (str)
                               Value: Output Wire names (list of str)
         sites (OrderedDict) - Key: Site Name + ' ' + Site Type (str)
-                              Value: PinWires (list of PinWire)
+                              Value: PinWires (frozenset of PinWire)
     """
 
     def __eq__(self, other):
@@ -329,32 +387,34 @@ class TileStruct(namedtuple('TileStruct', 'name type wires pips sites')):
         """
 
         tmp_err = ErrorHandle.errors
-        vivado = Vivado()
-        err = ErrorHandle()
-        ErrorHandle._header = f"Tile: {self.name} Type: {self.type}"
+        header = f"Tile: {self.name} Type: {self.type}"
 
         if type(other) != type(self):
             return False
 
         if self.name != other.name:
             err.err_print(
-                "Fatal Error: Tile names do not match. Abort compare.")
-            err.err_print(f"Name1: {self.name} Name2: {other.name}\n\n")
+                "Fatal Error: Tile names do not match. Abort compare.", header)
+            err.err_print(f"Name1: {self.name} Name2: {other.name}\n\n",
+                          header)
             return False
 
         # compare wires
-        keys = (set(self.wires.keys()), set(other.wires.keys()))
-        common_wires = keys[0].intersection(keys[1])
-        uncommon_wires = keys[0].symmetric_difference(keys[1])
+        # set operations on the key views avoid copying the keys into sets
+        wires, other_wires = self.wires.keys(), other.wires.keys()
+        # Equal key sets are the common case, and == compares the views
+        # without building the difference and intersection sets
+        same_wires = wires == other_wires
 
-        for wire in uncommon_wires:
+        for wire in () if same_wires else wires ^ other_wires:
 
-            if wire in keys[0]:
+            if wire in wires:
                 if vivado.wire(self.name, wire):
-                    err.ex_print("EXTRA_WIRE_EXCEPTION 011", f"Wire: {wire}")
+                    err.ex_print("EXTRA_WIRE_EXCEPTION 011", f"Wire: {wire}",
+                                 header)
                 else:
                     # Wire is not in Vivado or ISE
-                    err.err_print(f"Extra wire 010 {wire}")
+                    err.err_print(f"Extra wire 010 {wire}", header)
             else:
                 if vivado.wire(self.name, wire):
                     # Wire is in Vivado, ISE, and interchange but Vivado and
@@ -362,94 +422,98 @@ class TileStruct(namedtuple('TileStruct', 'name type wires pips sites')):
                     # cannot be properly generated.
                     # TCL script was used to verify that all wires here fall
                     # under this category
-                    err.ex_print("NODELESS_WIRE_EXCEPTION 101", f"Wire {wire}")
+                    err.ex_print("NODELESS_WIRE_EXCEPTION 101", f"Wire {wire}",
+                                 header)
                     vivado.tcl_print(f"{self.name}/{wire}")
                 else:
                     # Wire is only in ISE
-                    err.ex_print("MISSING_WIRE_EXCEPTION 100", f"Wire {wire}")
+                    err.ex_print("MISSING_WIRE_EXCEPTION 100", f"Wire {wire}",
+                                 header)
 
-        for wire in common_wires:
+        for wire in wires if same_wires else wires & other_wires:
             conns = self.wires[wire]
             other_conns = other.wires[wire]
+            # Matching wires are the common case in a correct file
+            if conns == other_conns:
+                continue
 
-            all_conns = (set(conns), set(other_conns))
-            uncommon = all_conns[0].symmetric_difference(all_conns[1])
-
-            for conn in uncommon:
+            for conn in conns.symmetric_difference(other_conns):
                 if vivado.wire(conn[0], conn[1]):
-                    if conn in all_conns[0]:
+                    if conn in conns:
                         err.ex_print("EXTRA_WIRE_EXCEPTION (Conn 011)",
-                                     f"Wire: {wire} Conn: {conn}")
+                                     f"Wire: {wire} Conn: {conn}", header)
                     elif vivado.wire(conn[0], conn[1]):
                         err.ex_print(
-                            "NODELESS_WIRE_EXCEPTION 101", f"Wire {conn}")
+                            "NODELESS_WIRE_EXCEPTION 101", f"Wire {conn}",
+                            header)
                         vivado.tcl_print(f"{conn[0]}/{conn[1]}")
                     else:
                         err.err_print(f"Missing conn {conn} for "
-                                      + f"wire {wire} 101")
+                                      + f"wire {wire} 101", header)
                 else:
-                    if conn in all_conns[0]:
-                        err.err_print(f"Extra conn {conn} for wire {wire} 010")
+                    if conn in conns:
+                        err.err_print(f"Extra conn {conn} for wire {wire} 010",
+                                      header)
                     else:
                         err.err_print(
-                            f"Missing conn {conn} for wire {wire} 100")
+                            f"Missing conn {conn} for wire {wire} 100", header)
 
         # compare pips
-        keys = [set(self.pips.keys()), set(other.pips.keys())]
-        common_pips = keys[0].intersection(keys[1])
-        uncommon_pips = keys[0].symmetric_difference(keys[1])
+        pips, other_pips = self.pips.keys(), other.pips.keys()
+        same_pips = pips == other_pips
 
-        for wire_in in uncommon_pips:
-            if wire_in in keys[0]:
+        for wire_in in () if same_pips else pips ^ other_pips:
+            if wire_in in pips:
                 if vivado.pip(self.name, wire_in, self.pips[wire_in][0]):
                     err.ex_print("EXTRA_PIP_EXCEPTION 011",
-                                 f"Pip {wire_in} {self.pips[wire_in]}")
+                                 f"Pip {wire_in} {self.pips[wire_in]}", header)
                 else:
                     pip_conns = self.pips[wire_in]
                     if (len(pip_conns) == 1
                         and vivado.wire(self.name, wire_in)
                             and vivado.wire(self.name, pip_conns[0])):
                         err.ex_print("EXTRA_INTERCHANGE_PIP_EXCEPTION",
-                                     f"Pip 001: {wire_in} {pip_conns} (wires 011)")
+                                     f"Pip 001: {wire_in} {pip_conns} (wires 011)",
+                                     header)
                     else:
                         err.err_print(
-                            f"Extra Pip {wire_in} {self.pips[wire_in]}")
+                            f"Extra Pip {wire_in} {self.pips[wire_in]}",
+                            header)
             else:
                 if vivado.pip(self.name, wire_in, other.pips[wire_in][0]):
-                    err.err_print(f"Missing Pip 110 {wire_in}")
+                    err.err_print(f"Missing Pip 110 {wire_in}", header)
                 else:
-                    err.err_print(f"Missing Pip 100 {wire_in}")
+                    err.err_print(f"Missing Pip 100 {wire_in}", header)
 
-        for wire_in in common_pips:
+        for wire_in in pips if same_pips else pips & other_pips:
             wire_outs = self.pips[wire_in]
             other_wire_outs = other.pips[wire_in]
+            if wire_outs == other_wire_outs:
+                continue
 
-            wire_outs.sort()
-            other_wire_outs.sort()
+            # Compared as sets, leaving the stored lists untouched
+            wire_outs = set(wire_outs)
+            other_wire_outs = set(other_wire_outs)
 
-            if wire_outs != other_wire_outs:
-                conns = [set(wire_outs), set(other_wire_outs)]
-                diffs = conns[0].symmetric_difference(other_wire_outs)
-                for conn in diffs:
-                    if conn in conns[0] and vivado.wire(self.name, conn):
-                        err.ex_print("EXTRA_WIRE_EXCEPTION 011",
-                                     f"Pip: {wire_in} {conn}")
-                    else:
-                        err.err_print(f"Pip conn missing for pip"
-                                      + f"{wire_in} {conn}")
+            for conn in wire_outs ^ other_wire_outs:
+                if conn in wire_outs and vivado.wire(self.name, conn):
+                    err.ex_print("EXTRA_WIRE_EXCEPTION 011",
+                                 f"Pip: {wire_in} {conn}", header)
+                else:
+                    err.err_print(f"Pip conn missing for pip"
+                                  + f"{wire_in} {conn}", header)
 
         # compare primitive sites
         common_sites = set()
-        if len(self.sites.keys()) != len(other.sites.keys()):
-            keys = [set(self.sites.keys()), set(other.sites.keys())]
-            common_sites = keys[0].intersection(keys[1])
-            uncommon_sites = keys[0].symmetric_difference(keys[1])
-
-            for site in uncommon_sites:
-                if site in keys[0]:
-                    err.err_print(f"Extra Site {site}")
+        if len(self.sites) != len(other.sites):
+            sites, other_sites = self.sites.keys(), other.sites.keys()
+            common_sites = sites & other_sites
+
+            for site in sites ^ other_sites:
+                if site in sites:
+                    err.err_print(f"Extra Site {site}", header)
                 else:
-                    err.err_print(f"Missing Site {site}")
+                    err.err_print(f"Missing Site {site}", header)
         else:
             for site0, site1 in zip(self.sites.items(), other.sites.items()):
                 if site0[0] == site1[0]:
@@ -459,11 +523,13 @@ class TileStruct(namedtuple('TileStruct', 'name type wires pips sites')):
                     common_sites.add(site0[0])
 
         for site in common_sites:
-            pinwires = set(self.sites[site])
-            other_pinwires = set(other.sites[site])
+            pinwires = self.sites[site]
+            other_pinwires = other.sites[site]
+            if pinwires == other_pinwires:
+                continue
 
-            for pw in pinwires.symmetric_difference(other_pinwires):
-                err.err_print(f"PinWire mismatch for {pw}")
+            for pw in pinwires ^ other_pinwires:
+                err.err_print(f"PinWire mismatch for {pw}", header)
 
         return tmp_err == ErrorHandle.errors
 
@@ -479,53 +545,70 @@ def build_tile_db(f, tileName, typeStr):
     """
 
     tile = TileStruct(tileName, typeStr, {}, {}, OrderedDict())
-    err = ErrorHandle()
+    # Bound locally, these are compared on every line of the tile
+    tile_summary_word = XDLRC_KEY_WORD_KEYS.tile_summary
+    wire_word = XDLRC_KEY_WORD_KEYS.wire
+    conn_word = XDLRC_KEY_WORD_KEYS.conn
+    pip_word = XDLRC_KEY_WORD_KEYS.pip
+    site_word = XDLRC_KEY_WORD_KEYS.site
+    pinwire_word = XDLRC_KEY_WORD_KEYS.pinwire
+    unbonded, routethrough = XDLRC_UNSUPPORTED_WORDS
+    # get_line() updates f.line in place, so this always holds the
+    # current line
+    line = f.line
+    wires, pips, sites = tile.wires, tile.pips, tile.sites
     get_line(f)
 
-    while f.line and f.line[0] != XDLRC_KEY_WORD_KEYS.tile_summary:
-        if f.line[0] == XDLRC_KEY_WORD_KEYS.wire:
+    while line and line[0] != tile_summary_word:
+        key_word = line[0]
+        if key_word == wire_word:
 
-            wire = f.line[1]
-            tile.wires[wire] = []
-            conns = tile.wires[wire]
+            wire = line[1]
+            conns = []
 
             get_line(f)
-            while f.line and (f.line[0] == XDLRC_KEY_WORD_KEYS.conn):
-                conns.append(tuple([f.line[1], f.line[2]]))
+            while line and (line[0] == conn_word):
+                conns.append((line[1], line[2]))
                 get_line(f)
+            # conns are only ever compared as sets, so store them as one
+            wires[wire] = frozenset(conns)
 
-        elif f.line[0] == XDLRC_KEY_WORD_KEYS.pip:
-            if f.line[2] not in tile.pips.keys():
-                tile.pips[f.line[2]] = []
-            tile.pips[f.line[2]].append(f.line[4])
-            if len(f.line) > 4 and XDLRC_UNSUPPORTED_WORDS[1] in f.line[4]:
-                ErrorHandle._header = f"Tile: {tileName} Type: {typeStr}"
+        elif key_word == pip_word:
+            wire_outs = pips.get(line[2])
+            if wire_outs is None:
+                pips[line[2]] = [line[4]]
+            else:
+                wire_outs.append(line[4])
+            if len(line) > 4 and routethrough in line[4]:
+                header = f"Tile: {tileName} Type: {typeStr}"
                 err.ex_print("ROUTETHROUGH_EXCEPTION",
-                             f"line :{f.line_num} Pip: {f.line}")
+                             f"line :{f.line_num} Pip: {line}", header)
             get_line(f)
 
-        elif f.line[0] == XDLRC_KEY_WORD_KEYS.site:
-            if f.line[3].upper() == XDLRC_UNSUPPORTED_WORDS[0]:
-                ErrorHandle._header = f"Tile: {tileName} Type: {typeStr}"
-                err.ex_print("PKG_SPECIFIC_EXCEPTION", f"line {f.line_num}:")
-                f.line.remove(f.line[3])
+        elif key_word == site_word:
+            if line[3].upper() == unbonded:
+                header = f"Tile: {tileName} Type: {typeStr}"
+                err.ex_print("PKG_SPECIFIC_EXCEPTION", f"line {f.line_num}:",
+                             header)
+                line.remove(line[3])
 
-            sites_key = f.line[1] + ' ' + f.line[2]
-            tile.sites[sites_key] = []
-            pin_wires = tile.sites[sites_key]
+            sites_key = line[1] + ' ' + line[2]
+            pin_wires = []
 
             get_line(f)
-            while (f.line and
-                   (f.line[0] == XDLRC_KEY_WORD_KEYS.pinwire)):
+            while (line and
+                   (line[0] == pinwire_word)):
 
-                direction = Direction.convert(f.line[2])
+                direction = direction_from_str(line[2])
                 pin_wires.append(
-                    PinWire(f.line[1], direction, f.line[3]))
+                    PinWire(line[1], direction, line[3]))
                 get_line(f)
+            # pinwires are only ever compared as sets, so store them as one
+            sites[sites_key] = frozenset(pin_wires)
         else:
             error_str = ("Error: build_tile_db() hit default branch\n"
                          + "This should not happen if XDLRC files are equal\n"
-                         + f"Line {f.line_num}: {f.line}\n")
+                         + f"Line {f.line_num}: {line}\n")
             err.err_print(error_str)
             sys.exit()
 
@@ -535,7 +618,7 @@ def build_tile_db(f, tileName, typeStr):
 class Conn(namedtuple('Conn', 'bel1 belpin1 bel2 belpin2')):
     """
     Lightweight class for holding XDLRC conn information.
-    __eq__() is overridden for accruate comparison
+    Compares and hashes as a plain tuple, so Conn can be in a set.
     Members:
         bel1    (str) - Name of the INPUT Bel
         belpin1 (str) - Name of the INPUT Bel pin
@@ -543,84 +626,78 @@ class Conn(namedtuple('Conn', 'bel1 belpin1 bel2 belpin2')):
         belpin2 (str) - Name of the OUTPUT Bel pin
     """
 
-    def __hash__(self):
-        return hash(tuple([self.bel1, self.belpin1, self.bel2, self.belpin2]))
-
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-
-        return ((self.bel1 == other.bel1)
-                and (self.bel2 == other.bel2)
-                and (self.belpin1 == other.belpin1)
-                and (self.belpin2 == other.belpin2))
-
 
 class Element(namedtuple('Element', 'name pins conns cfg')):
     """
     Lightweight class for holding XDLRC element information.
-    __eq__() is overridden for accruate comparison
+    __eq__() is overridden for accruate comparison, see compare()
     Members:
         name  (str)  - Element name
-        pins  (list) - List of Element pins (PinWire)
-        conns (list) - List of Element conns (Conn)
-        cfg   (list) - List of Element CFG strings
+        pins  (frozenset) - Set of Element pins (PinWire)
+        conns (frozenset) - Set of Element conns (Conn)
+        cfg   (list)      - List of Element CFG strings
     """
 
     def __eq__(self, other):
-        err = ErrorHandle()
+        return self.compare(other)
+
+    def compare(self, other, header=""):
+        """
+        Check two objects for equality, printing all errors found with
+        header.  Increments global _error count.
+        """
         tmp_err = ErrorHandle.errors
 
         if type(self) != type(other):
             return False
         if self.name != other.name:
-            err.err_print(f"Element name mismatch {self.name} != {other.name}")
+            err.err_print(f"Element name mismatch {self.name} != {other.name}",
+                          header)
             return False
 
-        pin_sets = (set(self.pins), set(other.pins))
-        assert len(self.pins) == len(pin_sets[0])
-        assert len(other.pins) == len(pin_sets[1])
-        conn_sets = (set(self.conns), set(other.conns))
-        assert len(self.conns) == len(conn_sets[0])
-        assert len(other.conns) == len(conn_sets[1])
-
-        for pin in pin_sets[0].symmetric_difference(pin_sets[1]):
-            if pin in pin_sets[0]:
+        for pin in self.pins ^ other.pins:
+            if pin in self.pins:
                 if "CARRY4_" in pin.name:
                     err.ex_print("CARRY4_EXCEPTION",
-                                 f"Element: {self.name} Pinwire {pin}")
+                                 f"Element: {self.name} Pinwire {pin}", header)
                 elif self.name == "CIN" or self.name == "PRECYINIT":
                     err.ex_print("CIN_PRECYINIT_EXCEPTION",
-                                 f"Extra Pinwire {pin} Element: {self.name}")
+                                 f"Extra Pinwire {pin} Element: {self.name}",
+                                 header)
                 else:
-                    err.err_print(f"Extra Element Pinwire {pin}")
+                    err.err_print(f"Extra Element Pinwire {pin}", header)
             else:
-                err.err_print(f"Missing Element Pinwire {pin}")
+                err.err_print(f"Missing Element Pinwire {pin}", header)
 
-        for conn in conn_sets[0].symmetric_difference(conn_sets[1]):
-            if len(conn_sets[0]) == len(conn_sets[1]):
+        for conn in self.conns ^ other.conns:
+            if len(self.conns) == len(other.conns):
                 err.err_print(
-                    f"Element Conn mismatch {conn} Element: {self.name}")
-            elif len(conn_sets[0]) > len(conn_sets[1]):
+                    f"Element Conn mismatch {conn} Element: {self.name}",
+                    header)
+            elif len(self.conns) > len(other.conns):
                 if "CARRY4_" in conn.bel1 or "CARRY4_" in conn.bel2:
                     err.ex_print("CARRY4_EXCEPTION",
-                                 f"Conn to extra CARRY4 element Conn: {conn}")
+                                 f"Conn to extra CARRY4 element Conn: {conn}",
+                                 header)
                 elif self.name == "CIN" or self.name == "PRECYINIT":
                     err.ex_print("CIN_PRECYINIT_EXCEPTION",
-                                 f"Conn {conn} Element: {self.name}")
+                                 f"Conn {conn} Element: {self.name}", header)
                 else:
                     err.err_print(
-                        f"Extra Element Conn {conn} Element: {self.name}")
+                        f"Extra Element Conn {conn} Element: {self.name}",
+                        header)
             else:
                 err.err_print(
-                    f"Missing Element Conn {conn} Element: {self.name}")
+                    f"Missing Element Conn {conn} Element: {self.name}",
+                    header)
 
         if set(self.cfg) != set(other.cfg):
             if len(self.cfg) == 0:
-                err.ex_print("CFG_ELEMENT_EXCEPTION", f"Element: {self.name}")
+                err.ex_print("CFG_ELEMENT_EXCEPTION", f"Element: {self.name}",
+                             header)
             elif self.name == "CIN" or self.name == "PRECYINIT":
                 err.ex_print("CIN_PRECYINIT_EXCEPTION",
-                             f"Element: {self.name} CFG: {self.cfg}")
+                             f"Element: {self.name} CFG: {self.cfg}", header)
             else:
                 c4 = False
                 for i in self.cfg:
@@ -629,10 +706,12 @@ class Element(namedtuple('Element', 'name pins conns cfg')):
                         break
                 if c4:
                     err.ex_print("CARRY4_EXCEPTION",
-                                 f"Element: {self.name} CFG: {self.cfg}")
+                                 f"Element: {self.name} CFG: {self.cfg}",
+                                 header)
                 else:
                     err.err_print(
-                        f"CFG mismatch Element: {self.name} {self.cfg} {other.cfg}")
+                        f"CFG mismatch Element: {self.name} {self.cfg} {other.cfg}",
+                        header)
 
         return tmp_err == ErrorHandle.errors
 
@@ -664,48 +743,49 @@ class PrimDef(namedtuple('PrimDef', 'name pins elements')):
         if type(self) != type(other):
             return False
 
-        err = ErrorHandle()
-        ErrorHandle._header = f"Prim_Def {self.name}"
+        header = f"Prim_Def {self.name}"
         if self.name != other.name:
             err.err_print("Fatal Error: Primitive Def name mismatch\n"
-                          + f"Name1: {self.name} Name2: {other.name}")
+                          + f"Name1: {self.name} Name2: {other.name}", header)
             return False
 
         tmp_err = ErrorHandle.errors
 
         # Check pins
-        pins = set(self.pins.keys())
-        other_pins = set(other.pins.keys())
+        pins, other_pins = self.pins.keys(), other.pins.keys()
 
-        for pin in pins.symmetric_difference(other_pins):
-            if pin not in pins:
-                err.err_print(f"Extra Pin {self.pins[pin]}")
+        for pin in pins ^ other_pins:
+            if pin in pins:
+                err.err_print(f"Extra Pin {self.pins[pin]}", header)
             else:
-                err.err_print(f"Missing Pin {other.pins[pin]}")
+                err.err_print(f"Missing Pin {other.pins[pin]}", header)
 
-        for pin in pins.intersection(other_pins):
+        for pin in pins & other_pins:
             if self.pins[pin] != other.pins[pin]:
                 err.err_print(
-                    f"Pin Mismatch\n\t{self.pins[pin]}\n\t{other.pins[pin]}")
+                    f"Pin Mismatch\n\t{self.pins[pin]}\n\t{other.pins[pin]}",
+                    header)
         # Check elements
-        keys = set(self.elements.keys())
-        other_keys = set(other.elements.keys())
+        keys, other_keys = self.elements.keys(), other.elements.keys()
 
-        for key in keys.symmetric_difference(other_keys):
-            if key in self.elements.keys():
+        for key in keys ^ other_keys:
+            if key in self.elements:
                 if "CARRY4" in key:
-                    err.ex_print(f"CARRY4_EXCEPTION", f"Extra Element: {key}")
+                    err.ex_print(f"CARRY4_EXCEPTION", f"Extra Element: {key}",
+                                 header)
                 else:
-                    err.err_print(f"Extra Element {key}")
+                    err.err_print(f"Extra Element {key}", header)
             else:
                 if XDLRC_UNSUPPORTED_WORDS[1] in key:
                     err.ex_print("ROUTETHROUGH EXCEPTION",
-                                 f"Missing Element {key}")
+                                 f"Missing Element {key}", header)
                 else:
-                    err.err_print(f"Missing Element {key}")
+                    err.err_print(f"Missing Element {key}", header)
 
-        for key in keys.intersection(other_keys):
-            self.elements[key] == other.elements[key]
+        # Element.compare() reports its own mismatches and counts them in
+        # ErrorHandle.errors, so its result is not needed here.
+        for key in keys & other_keys:
+            self.elements[key].compare(other.elements[key], header)
 
         return tmp_err == ErrorHandle.errors
 
@@ -720,48 +800,62 @@ def build_prim_def_db(f, name):
         prim_def - PrimDef object representing the primitive_def.
     """
     prim_def = PrimDef(name, {}, {})
+    # Bound locally, these are compared on every line of the primitive_def
+    prim_def_word = XDLRC_KEY_WORD_KEYS.prim_def
+    summary_word = XDLRC_KEY_WORD_KEYS.summary
+    pin_word = XDLRC_KEY_WORD_KEYS.pin
+    element_word = XDLRC_KEY_WORD_KEYS.element
+    conn_word = XDLRC_KEY_WORD_KEYS.conn
+    cfg_word = XDLRC_KEY_WORD_KEYS.cfg
+    # get_line() updates f.line in place, so this always holds the
+    # current line
+    line = f.line
     get_line(f)
-    err = ErrorHandle()
-    ErrorHandle._header = ""
-
-    while (f.line and (f.line[0] != XDLRC_KEY_WORD_KEYS.prim_def)
-           and f.line[0] != XDLRC_KEY_WORD_KEYS.summary):
-        if f.line[0] == XDLRC_KEY_WORD_KEYS.pin:
-            pin_wire = PinWire(f.line[1], Direction.convert(f.line[2]),
-                               f.line[3])
-            prim_def.pins[f.line[1]] = pin_wire
+
+    while line and line[0] != prim_def_word and line[0] != summary_word:
+        key_word = line[0]
+        if key_word == pin_word:
+            pin_wire = PinWire(line[1], direction_from_str(line[2]),
+                               line[3])
+            prim_def.pins[line[1]] = pin_wire
             get_line(f)
-        elif f.line[0] == XDLRC_KEY_WORD_KEYS.element:
-            if f.line[2] != '0':  # make sure there is more than just cfg
-                element = Element(f.line[1], [], [], [])
-                prim_def.elements[f.line[1]] = element
-                element = prim_def.elements[f.line[1]]
+        elif key_word == element_word:
+            if line[2] != '0':  # make sure there is more than just cfg
+                element_name = line[1]
+                pins = []
+                conns = []
+                cfg = []
                 get_line(f)
 
-                while f.line:
-                    if f.line[0] == XDLRC_KEY_WORD_KEYS.pin:
-                        element.pins.append(
-                            PinWire(f.line[1],
-                                    Direction.convert(f.line[2]), ''))
+                while line:
+                    key_word = line[0]
+                    if key_word == pin_word:
+                        pins.append(
+                            PinWire(line[1],
+                                    direction_from_str(line[2]), ''))
                         get_line(f)
-                    elif f.line[0] == XDLRC_KEY_WORD_KEYS.conn:
-                        if f.line[3] == '==>':
-                            element.conns.append(Conn(f.line[1], f.line[2],
-                                                      f.line[4], f.line[5]))
+                    elif key_word == conn_word:
+                        if line[3] == '==>':
+                            conns.append(Conn(line[1], line[2],
+                                              line[4], line[5]))
                         else:
-                            element.conns.append(Conn(f.line[4], f.line[5],
-                                                      f.line[1], f.line[2]))
+                            conns.append(Conn(line[4], line[5],
+                                              line[1], line[2]))
                         get_line(f)
-                    elif f.line[0] == XDLRC_KEY_WORD_KEYS.cfg:
-                        element.cfg.extend(f.line[1:])
+                    elif key_word == cfg_word:
+                        cfg.extend(line[1:])
                         get_line(f)
                     else:
                         break
+
+                # pins and conns are only ever compared as sets
+                prim_def.elements[element_name] = Element(
+                    element_name, frozenset(pins), frozenset(conns), cfg)
             else:
                 err.ex_print("CFG_ELEMENT_EXCEPTION",
                              f"caught on line {f.line_num}")
                 get_line(f)
-        elif f.line[0] == XDLRC_KEY_WORD_KEYS.cfg:
+        elif key_word == cfg_word:
             get_line(f)
         else:
             err.err_print(f"Error: build_prim_def_db hit default branch\n"
@@ -771,6 +865,114 @@ def build_prim_def_db(f, name):
     return prim_def
 
 
+# Start of a TILE, TILE_SUMMARY, PRIMITIVE_DEFS and PRIMITIVE_DEF
+# declaration line
+TILE_RE = re.compile(rb'^[ \t]*\(?tile[ \t]', re.M | re.I)
+TILE_SUMMARY_RE = re.compile(rb'^[ \t]*\(?tile_summary[ \t]', re.M | re.I)
+PRIM_DEFS_RE = re.compile(rb'^[ \t]*\(?primitive_defs[ \t]', re.M | re.I)
+PRIM_DEF_RE = re.compile(rb'^[ \t]*\(?primitive_def[ \t]', re.M | re.I)
+# Line ending a primitive_def body, see build_prim_def_db()
+PRIM_DEF_END_RE = re.compile(rb'^[ \t]*\(?(?:primitive_def|summary)[ \t]',
+                             re.M | re.I)
+
+# Lines that get_line() skips over without returning them
+SKIPPED_LINES = rb'(?:[ \t\r()]*+(?:#[^\n]*+)?\n)*+'
+
+# Anything in a tile body that build_tile_db() reports on by itself: a
+# line that does not start with a tile body key word, a conn that does
+# not follow a wire, a pinwire that does not follow a primitive_site or
+# an unsupported word. Tiles containing one are always parsed.
+TILE_BODY_SLOW_RE = re.compile(
+    rb'^[ \t\r()]*+(?:'
+    rb'(?!(?:wire|conn|pip|primitive_site|pinwire)[ \t\r\n])[^ \t\r\n#()]'
+    rb'|(?:pip|primitive_site|pinwire)(?:[ \t\r][^\n]*+)?\n'
+    + SKIPPED_LINES + rb'[ \t\r()]*+conn[ \t\r\n]'
+    rb'|(?:wire|conn|pip)(?:[ \t\r][^\n]*+)?\n'
+    + SKIPPED_LINES + rb'[ \t\r()]*+pinwire[ \t\r\n])'
+    rb'|\A' + SKIPPED_LINES + rb'[ \t\r()]*+(?:conn|pinwire)[ \t\r\n]'
+    rb'|unbonded|_routethrough', re.M | re.I)
+
+# The same for a primitive_def body and build_prim_def_db(), where a
+# conn is only read as part of an element with pins. Elements with no
+# pins are reported by cfg_elements() instead.
+PRIM_DEF_BODY_SLOW_RE = re.compile(
+    rb'^[ \t\r()]*+(?!(?:pin|element|conn|cfg)[ \t\r\n])[^ \t\r\n#()]'
+    rb'|(?:\A|^[ \t\r()]*+element[ \t]++[^ \t\r\n]++[ \t]++0'
+    rb'(?:[ \t\r)]*+|[ \t][^\n]*+)\n)'
+    rb'(?:(?![ \t\r()]*+(?:element|conn)[ \t\r\n])[^\n]*+\n)*+'
+    rb'[ \t\r()]*+conn[ \t\r\n]', re.M | re.I)
+ELEMENT_RE = re.compile(rb'^[ \t\r()]*element', re.M | re.I)
+
+
+def skip_to(f, regex):
+    """
+    Move f to the next line matching regex and read it with get_line(),
+    without tokenizing the lines in between.
+    Assumes file_init() has been executed for f.
+    """
+
+    mm = f.mm
+    pos = mm.tell()
+    match = regex.search(mm, pos)
+    start = match.start() if match else len(mm)
+    f.line_num += mm[pos:start].count(b'\n')
+    mm.seek(start)
+    get_line(f)
+
+
+def skip_equal(f1, f2, end_re, slow_re):
+    """
+    Skip ahead in both files to the next line matching end_re and read
+    it with get_line(), if the bytes up to it are the same in each file
+    and do not match slow_re. Such spans would parse and compare equal.
+    Assumes file_init() has been executed for each file parameter.
+    Returns:
+        span - The skipped bytes, or None if the files were not moved
+    """
+
+    mm1, mm2 = f1.mm, f2.mm
+    pos1, pos2 = mm1.tell(), mm2.tell()
+    match1 = end_re.search(mm1, pos1)
+    match2 = end_re.search(mm2, pos2)
+    if not (match1 and match2):
+        return None
+
+    span = mm1[pos1:match1.start()]
+    if span != mm2[pos2:match2.start()] or slow_re.search(span):
+        return None
+
+    lines = span.count(b'\n')
+    f1.line_num += lines
+    f2.line_num += lines
+    mm1.seek(match1.start())
+    mm2.seek(match2.start())
+    get_line(f1, f2)
+    return span
+
+
+def cfg_elements(span, line_num):
+    """
+    Report the elements with only CFG bits in a primitive_def body
+    skipped by skip_equal(), as build_prim_def_db() would have.
+    Parameters:
+        span (bytes) - The skipped primitive_def body
+        line_num (int) - Line number of the PRIMITIVE_DEF declaration
+    """
+
+    element_word = XDLRC_KEY_WORD_KEYS.element
+    pos = 0
+    for match in ELEMENT_RE.finditer(span):
+        start = match.start()
+        line_num += span.count(b'\n', pos, start)
+        pos = start
+        end = span.find(b'\n', start)
+        line = span[start:end] if end != -1 else span[start:]
+        line = line.strip(b"()\r\n\t ").upper().decode().split()
+        if line[0] == element_word and line[2:3] == ['0']:
+            err.ex_print("CFG_ELEMENT_EXCEPTION",
+                         f"caught on line {line_num + 1}")
+
+
 def compare_tile(f1, f2):
     """
     Parse and compare a single tile.
@@ -779,27 +981,34 @@ def compare_tile(f1, f2):
 
     # Check Tile Header
     assert_equal(f1.line, f2.line)
+    name = f1.line[3]
 
-    tile1 = build_tile_db(f1, f1.line[3], f1.line[4])
-    tile2 = build_tile_db(f2, f2.line[3], f2.line[4])
+    # Most tiles match byte for byte and need no parsing
+    if skip_equal(f1, f2, TILE_SUMMARY_RE, TILE_BODY_SLOW_RE) is None:
+        tile1 = build_tile_db(f1, f1.line[3], f1.line[4])
+        tile2 = build_tile_db(f2, f2.line[3], f2.line[4])
 
-    # Check Tile contents
-    # __eq__ is overridden so this line actually does stuff
-    tile1 == tile2
+        # Check Tile contents
+        # __eq__ is overridden so this line actually does stuff
+        tile1 == tile2
 
     # Check Tile summary
+    # Matching summaries are the common case, only work out which count
+    # is off when they differ.
     # This first check accounts for EXTRA_WIRE_EXCEPTION making the summay
     # wire count be off
-    err = ErrorHandle()
-    ErrorHandle._header = f"Tile: {tile1.name}"
-    if f1.line[4] != f2.line[4]:
-        err.ex_print("EXTRA_WIRE_EXCEPTION", f"line {f2.line_num}:"
-                     + f"{f1.line_num} summary wire count mismatch")
-    elif f1.line[5] != f2.line[5]:
-        err.ex_print("EXTRA_PIP_EXCEPTION", f"line {f2.line_num}:{f1.line_num} "
-                     + f"summary pip count mismatch")
-    else:
-        assert_equal(f1.line, f2.line)
+    if f1.line != f2.line:
+        header = f"Tile: {name}"
+        if f1.line[4] != f2.line[4]:
+            err.ex_print("EXTRA_WIRE_EXCEPTION", f"line {f2.line_num}:"
+                         + f"{f1.line_num} summary wire count mismatch",
+                         header)
+        elif f1.line[5] != f2.line[5]:
+            err.ex_print("EXTRA_PIP_EXCEPTION", f"line {f2.line_num}:"
+                         + f"{f1.line_num} summary pip count mismatch",
+                         header)
+        else:
+            assert_equal(f1.line, f2.line)
 
     get_line(f1, f2)
 
@@ -810,9 +1019,6 @@ def compare_prim_defs(f1, f2):
     Assumes file_init() has been executed for each file parameter.
     """
 
-    err = ErrorHandle()
-    ErrorHandle._header = ""
-
     # Check primitive_defs declaration
     if f1.line != f2.line:
         err.ex_print("PRIM_DEF_GENERAL_EXCEPTION",
@@ -820,23 +1026,30 @@ def compare_prim_defs(f1, f2):
     get_line(f1, f2)
 
     # Primitive_def checks
-    while f1.line and f2.line and f1.line[0] != XDLRC_KEY_WORD_KEYS.summary:
+    summary_word = XDLRC_KEY_WORD_KEYS.summary
+    while f1.line and f2.line and f1.line[0] != summary_word:
         while f2.line[1] != f1.line[1]:  # Not all ISE prim defs represented
             err.ex_print("PRIM_DEF_GENERAL_EXCEPTION",
                          f"caught on line {f2.line_num}. PRIMITIVE_DEF {f2.line[1]} missing.")
-            get_line(f2)
-            while f2.line[0] != XDLRC_KEY_WORD_KEYS.prim_def:
-                get_line(f2)
+            skip_to(f2, PRIM_DEF_RE)
 
         # Elements w/ only CFG bits are not supported, so comparing
         # element count will likely fail. So element cnt is dropped.
         if f2.line[3] != f1.line[3]:
             err.ex_print("CFG_PRIM_DEF_EXCEPTION",
-                         f"caught on line {f2.line_num}")
-        f2.line = f2.line[:3]
-        f1.line = f1.line[:3]
-
-        assert_equal(f1.line, f2.line)
+                         f"caught on line {f2.line_num}",
+                         f"Prim_Def {f1.line[1]}")
+        # The names already match, so only the pin count is left
+        if f1.line[2] != f2.line[2]:
+            assert_equal(f1.line[:3], f2.line[:3])
+
+        # Most primitive_defs match byte for byte and need no parsing
+        line_num1, line_num2 = f1.line_num, f2.line_num
+        span = skip_equal(f1, f2, PRIM_DEF_END_RE, PRIM_DEF_BODY_SLOW_RE)
+        if span is not None:
+            cfg_elements(span, line_num1)
+            cfg_elements(span, line_num2)
+            continue
 
         prim_def1 = build_prim_def_db(f1, f1.line[1])
         prim_def2 = build_prim_def_db(f2, f2.line[1])
@@ -845,7 +1058,163 @@ def compare_prim_defs(f1, f2):
         prim_def1 == prim_def2
 
 
-def compare_xdlrc(f1, f2):
+def find_tiles(f):
+    """
+    Find the tile declarations of f without parsing the tiles.
+    Assumes file_init() has been executed for f.
+    Returns:
+        tiles - List of (offset, line_num) of each TILE declaration,
+                where line_num counts the lines before it.
+        end   - (offset, line_num) of the PRIMITIVE_DEFS declaration,
+                or of EOF if there is none.
+    """
+
+    mm = f.mm
+    if not isinstance(mm, mmap.mmap):
+        # Empty file, see file_init()
+        return [], (0, 0)
+
+    match = PRIM_DEFS_RE.search(mm)
+    end = match.start() if match else len(mm)
+
+    tiles = []
+    pos = line_num = 0
+    for match in TILE_RE.finditer(mm, 0, end):
+        line_num += mm[pos:match.start()].count(b'\n')
+        pos = match.start()
+        tiles.append((pos, line_num))
+
+    return tiles, (end, line_num + mm[pos:end].count(b'\n'))
+
+
+def _seek_line(f, offset, line_num):
+    """Move f to the line at offset, see find_tiles()"""
+    f.mm.seek(offset)
+    f.line_num = line_num
+
+
+def _tile_name(f, offset):
+    """Name of the tile declared at offset, see find_tiles()"""
+    mm = f.mm
+    end = mm.find(b'\n', offset)
+    line = mm[offset:end if end != -1 else len(mm)]
+    line = line.strip(b"()\r\n\t ").upper().decode().split()
+    return line[3] if len(line) > 3 else ''
+
+
+def _init_tile_worker(f1, f2):
+    """Set up a compare_tiles_parallel() worker to buffer its output"""
+    global _tile_worker_files
+    _tile_worker_files = (f1, f2)
+    # The inherited output files were flushed before the pool started,
+    # so closing them here writes nothing
+    for out_f in (ErrorHandle.error_f, ErrorHandle.exception_f, Vivado.TCL_F):
+        out_f.close()
+    ErrorHandle.error_f = io.StringIO()
+    ErrorHandle.exception_f = io.StringIO()
+    Vivado.TCL_F = io.StringIO()
+    Vivado.tcl_print = Vivado._tcl_print_next
+
+
+def _compare_tiles_worker(task):
+    """
+    Compare a run of consecutive tile pairs in a worker process.
+    task is the find_tiles() position of the first tile in each file and
+    the number of tiles to compare.
+    Returns whether the compare hit a fatal error, the error count, the
+    newly seen unknown key words and the error, exception and tcl output.
+    """
+
+    f1, f2 = _tile_worker_files
+    tile1, tile2, count = task
+    errors = ErrorHandle.errors
+    num_unknowns = len(ErrorHandle.unknowns)
+
+    # Within the run the files are walked in lockstep, as in a serial
+    # compare, so each file is only seeked once
+    _seek_line(f1, *tile1)
+    _seek_line(f2, *tile2)
+    get_line(f1, f2)
+    fatal = False
+    try:
+        for i in range(count):
+            compare_tile(f1, f2)
+    except SystemExit:
+        # build_tile_db() exits on lines it cannot parse. Exiting here
+        # would kill the worker and leave the pool waiting for its result
+        fatal = True
+
+    out = [fatal, ErrorHandle.errors - errors,
+           list(ErrorHandle.unknowns)[num_unknowns:]]
+    for buf in (ErrorHandle.error_f, ErrorHandle.exception_f, Vivado.TCL_F):
+        out.append(buf.getvalue())
+        buf.seek(0)
+        buf.truncate()
+    return out
+
+
+def compare_tiles_parallel(f1, f2, jobs):
+    """
+    Compare all tiles using a pool of jobs worker processes.
+    Tiles are paired by position and handed to the workers in runs of
+    consecutive tiles. Tiles left without a pair, when one file has more
+    tiles, are reported as an error. Their output is written in tile order, so the
+    results match a serial compare. Relies on fork so the
+    workers share the mapped files and the loaded Vivado data. Each
+    worker warns once about each unknown key word it encounters.
+    A fatal error in a tile exits once the output before it is written,
+    as the serial compare does.
+    Assumes the TILES declaration is the current line of each file.
+    Leaves each file at its PRIMITIVE_DEFS declaration.
+    """
+
+    tiles1, end1 = find_tiles(f1)
+    tiles2, end2 = find_tiles(f2)
+
+    # Tiles past the end of the shorter list have nothing to be compared
+    # against, they are reported once the paired tiles are done
+    num_tiles = min(len(tiles1), len(tiles2))
+    unpaired = [_tile_name(f, offset)
+                for f, tiles in ((f1, tiles1), (f2, tiles2))
+                for offset, line_num in tiles[num_tiles:]]
+
+    # Enough runs per worker to balance the load between them
+    run = max(1, num_tiles // (jobs * 16))
+    tasks = [(tiles1[i], tiles2[i], min(run, num_tiles - i))
+             for i in range(0, num_tiles, run)]
+
+    # Buffered output would otherwise be written again by each worker
+    for out_f in (ErrorHandle.error_f, ErrorHandle.exception_f, Vivado.TCL_F):
+        out_f.flush()
+
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(jobs, _init_tile_worker, (f1, f2)) as pool:
+        results = pool.imap(_compare_tiles_worker, tasks)
+        for fatal, errors, unknowns, err_str, ex_str, tcl_str in results:
+            ErrorHandle.errors += errors
+            ErrorHandle.unknowns.update(dict.fromkeys(unknowns))
+            ErrorHandle.error_f.write(err_str)
+            ErrorHandle.exception_f.write(ex_str)
+            # Workers always write the separating comma first
+            for tcl in tcl_str.split(',')[1:]:
+                vivado.tcl_print(tcl)
+            if fatal:
+                pool.terminate()
+                sys.exit()
+        # Let the workers exit cleanly so their printed warnings are flushed
+        pool.close()
+        pool.join()
+
+    if unpaired:
+        err.err_print(f"Tile count mismatch {len(tiles1)}:{len(tiles2)}."
+                      + f" Unpaired tiles: {' '.join(unpaired)}")
+
+    _seek_line(f1, *end1)
+    _seek_line(f2, *end2)
+    get_line(f1, f2)
+
+
+def compare_xdlrc(f1, f2, jobs=1):
     """
     Compare two xdlrc files for equality.
     Tiles must be listed in the same order. Primitive Def headers must
@@ -853,37 +1222,89 @@ def compare_xdlrc(f1, f2):
     Assumes that file2 has been generated correctly and file1 is being
     checked against it for correctness.
     Assumes file_init() has been executed for each file parameter.
+    Parameters:
+        jobs (int) - Number of processes comparing tiles
     """
 
+    prim_defs_word = XDLRC_KEY_WORD_KEYS.prim_defs
+
     # check Tiles row_num col_num declaration
     assert_equal(f1.line, f2.line)
 
     # Tile chekcs
-    get_line(f1, f2)
-    while (f1.line and f2.line
-           and (f1.line[0] != XDLRC_KEY_WORD_KEYS.prim_defs)):
-        compare_tile(f1, f2)
+    if jobs > 1:
+        compare_tiles_parallel(f1, f2, jobs)
+    else:
+        get_line(f1, f2)
+        while (f1.line and f2.line
+               and (f1.line[0] != prim_defs_word)):
+            compare_tile(f1, f2)
+
+    # Only tiles are checked against Vivado, release its info early
+    Vivado.info = {}
 
-    while (f2.line[0] != XDLRC_KEY_WORD_KEYS.prim_defs):
+    while (f2.line[0] != prim_defs_word):
         get_line(f2)
     compare_prim_defs(f1, f2)
 
     # This will fail due to PRIM_DEF_GENERAL_EXCEPTION
-    err = ErrorHandle()
     err.ex_print("PRIM_DEF_GENERAL_EXCEPTION",
                  f"Summary line mismatch:\n\t{f1.line}\n\t{f2.line}")
 
 
-def init(fileName=''):
+def init(fileName='', device_cache=None):
     """
     Set up the environment for __main__.
     Also useful to run after an import for debugging/testing
     Parameters:
-        fileName (str) - Name of file to pass to XDLRC constructor
+        fileName (str)      - Name of file to pass to XDLRC constructor
+        device_cache (str)  - Optional path of a device cache, see
+                              read_device()
     """
 
     device_schema = Interchange(SCHEMA_DIR).device_resources_schema.Device
-    return XDLRC(read_capnp_file(device_schema, DEVICE_FILE), fileName)
+    return XDLRC(read_device(device_schema, device_cache), fileName)
+
+
+def read_device(device_schema, cache=None):
+    """
+    Read DEVICE_FILE, going through an inflated copy of it when a cache
+    path is given. The device file is gzip'd, so every read has to
+    inflate the whole message first. The cache holds the inflated
+    (still packed) message and is rebuilt whenever DEVICE_FILE is newer.
+    A failed cache write only prints a warning.
+    Parameters:
+        device_schema   - capnp schema of the Device struct
+        cache (str)     - Path of the cache file, None to read
+                          DEVICE_FILE directly
+    """
+
+    if cache is None:
+        return read_capnp_file(device_schema, DEVICE_FILE)
+
+    try:
+        fresh = os.path.getmtime(cache) >= os.path.getmtime(DEVICE_FILE)
+    except OSError:
+        fresh = False
+
+    if not fresh:
+        tmp = cache + ".tmp"
+        try:
+            with gzip.open(DEVICE_FILE, "rb") as f_in, \
+                    open(tmp, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out, OUT_BUFFER_SIZE)
+            os.replace(tmp, cache)
+        except OSError as e:
+            print(f"Warning: Could not write device cache {cache}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return read_capnp_file(device_schema, DEVICE_FILE)
+
+    with open(cache, "rb") as f:
+        return read_capnp_file(device_schema, f,
+                               CompressionFormat.UNCOMPRESSED)
 
 
 def argparse_setup():
@@ -900,6 +1321,10 @@ def argparse_setup():
                         nargs='?', default='')
     parser.add_argument("--ex", help="Name of known exception file")
     parser.add_argument("-e", help="Name of error output file")
+    parser.add_argument("-j", "--jobs", help="Number of processes comparing"
+                        + " tiles", type=int, default=1)
+    parser.add_argument("--device-cache", help="File to keep an inflated"
+                        + " copy of the device file in between runs")
     group = parser.add_mutually_exclusive_group()
     group.add_argument("-t", "--tile", help="Parse files as single tile",
                        action="store_true")
@@ -915,10 +1340,10 @@ if __name__ == "__main__":
     args = argparse_setup()
 
     if not args.no_gen and not (args.tile or args.prim_defs):
-        myDevice = init(args.dir+args.TEST_XDLRC)
-        start = time.time()
+        myDevice = init(args.dir+args.TEST_XDLRC, args.device_cache)
+        start = time.perf_counter()
         myDevice.generate_XDLRC()
-        finish = time.time() - start
+        finish = time.perf_counter() - start
         print(f"XDLRC {args.dir+args.TEST_XDLRC} generated in {finish} sec ")
 
     if args.ex:
@@ -926,27 +1351,27 @@ if __name__ == "__main__":
     if args.e:
         ErrorHandle.XDLRC_Errors = args.e
 
-    err = ErrorHandle()
     err.setup()
-    with (open(args.dir+args.TEST_XDLRC, "r") as f1,
-          open(args.dir+args.CORRECT_XDLRC, "r") as f2):
+    with (open(args.dir+args.TEST_XDLRC, "rb") as f1,
+          open(args.dir+args.CORRECT_XDLRC, "rb") as f2):
 
         file_init(f1, f2)
-        vivado = Vivado()
         vivado.setup()
 
-        start = time.time()
+        start = time.perf_counter()
 
         if args.tile:
             compare_tile(f1, f2)
         elif args.prim_defs:
             compare_prim_defs(f1, f2)
         else:
-            compare_xdlrc(f1, f2)
+            compare_xdlrc(f1, f2, args.jobs)
 
-        finish = time.time() - start
+        finish = time.perf_counter() - start
         print(f"XDLRC compared in {finish} seconds")
         vivado.cleanup()
+        f1.mm.close()
+        f2.mm.close()
 
     err.cleanup()
     print(f"Done comparing XDLRC files. Errors: {ErrorHandle.errors}")
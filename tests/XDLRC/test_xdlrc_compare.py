@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020  The SymbiFlow Authors.
+#
+# Use of this source code is governed by a ISC-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/ISC
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import os
+import re
+import signal
+import tempfile
+import unittest
+from unittest import mock
+
+import test_xdlrc
+from test_xdlrc import ErrorHandle, Vivado, compare_xdlrc, err, file_init, \
+    vivado
+
+NUM_TILES = 4
+
+
+def tile(col, body=None, summary="1 2 1"):
+    """XDLRC text of tile T<col>, with a default body"""
+    name = f"T{col}"
+    if body is None:
+        body = (f"\t\t(PRIMITIVE_SITE S{col} SLICEL internal 2\n"
+                f"\t\t\t(PINWIRE A input W0)\n"
+                f"\t\t\t(PINWIRE B output W1)\n"
+                f"\t\t)\n"
+                f"\t\t(WIRE W0 1\n"
+                f"\t\t\t(CONN T{(col + 1) % NUM_TILES} W1)\n"
+                f"\t\t)\n"
+                f"\t\t(WIRE W1 0)\n"
+                f"\t\t(PIP {name} W0 -> W1)\n")
+    return (f"\t(TILE 0 {col} {name} INT 1\n{body}"
+            f"\t\t(TILE_SUMMARY {name} INT {summary})\n\t)\n")
+
+
+PRIM_DEFS = """(PRIMITIVE_DEFS 2
+\t(PRIMITIVE_DEF PD0 2 2
+\t\t(PIN A A input)
+\t\t(PIN B B output)
+\t\t(ELEMENT E0 2
+\t\t\t(PIN A input)
+\t\t\t(PIN B output)
+\t\t\t(CONN E0 B ==> E1 A)
+\t\t)
+\t\t(ELEMENT E1 0
+\t\t)
+\t)
+\t(PRIMITIVE_DEF PD1 1 1
+\t\t(PIN A A input)
+\t\t(ELEMENT E0 0)
+\t)
+)
+"""
+
+
+def xdlrc(tiles=None, prim_defs=PRIM_DEFS):
+    """XDLRC text of the given tiles, NUM_TILES default tiles if None"""
+    if tiles is None:
+        tiles = [tile(col) for col in range(NUM_TILES)]
+    header = "(XDL_RESOURCE_REPORT v0.2 xc7a100t artix7\n# comment line\n\n"
+    summary = "(SUMMARY tiles=4 sites=4 sitedefs=2)\n)\n"
+    return (header + f"(TILES 1 {len(tiles)}\n" + "".join(tiles) + ")\n" +
+            prim_defs + summary)
+
+
+def compare(test, correct, jobs=1):
+    """
+    Run compare_xdlrc() on two XDLRC strings.
+    Returns whether the compare exited, the error count and the error,
+    exception and tcl output.
+    """
+    info = {
+        f"T{col}": {
+            "pips": [],
+            "wires": [],
+            "sites": []
+        }
+        for col in range(NUM_TILES)
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [
+            os.path.join(tmp, name)
+            for name in ("test.xdlrc", "correct.xdlrc", "info.json",
+                         "errors.txt", "exceptions.txt", "wires.tcl")
+        ]
+        for path, text in zip(paths, (test, correct, json.dumps(info))):
+            with open(path, "w") as f:
+                f.write(text)
+
+        with mock.patch.multiple(test_xdlrc, VIVADO_INFO=paths[2],
+                                 TCL_FILE_OUT=paths[5]), \
+                mock.patch.multiple(ErrorHandle, XDLRC_Errors=paths[3],
+                                    XDLRC_Exceptions=paths[4], errors=0,
+                                    unknowns={}), \
+                mock.patch.multiple(Vivado, info={}, TCL_F=None,
+                                    tcl_print=Vivado.tcl_print):
+            err.setup()
+            vivado.setup()
+            exited = False
+            with open(paths[0], "rb") as f1, open(paths[1], "rb") as f2:
+                file_init(f1, f2)
+                try:
+                    compare_xdlrc(f1, f2, jobs)
+                except SystemExit:
+                    exited = True
+                f1.mm.close()
+                f2.mm.close()
+            vivado.cleanup()
+            err.cleanup()
+            errors = ErrorHandle.errors
+
+        out = []
+        for path in paths[3:]:
+            with open(path) as f:
+                out.append(f.read())
+
+    return (exited, errors, *out)
+
+
+class TestCompareTilesParallel(unittest.TestCase):
+    def test_parallel_matches_serial(self):
+        tiles = [tile(col) for col in range(NUM_TILES)]
+        # Reported with the line number of each file
+        tiles[2] = tiles[2].replace("W0 -> W1)", "W0 -> W1_ROUTETHROUGH)")
+        correct = xdlrc(tiles)
+        tiles[0] = tile(0, summary="1 3 1")
+        tiles[1] = tiles[1].replace("(CONN T2 W1)", "(CONN T2 W0)")
+        tiles[2] = tiles[2].replace("(WIRE W1 0)\n", "(FOO W1)\n")
+        tiles[3] = tiles[3].replace("(PIP T3 W0 -> W1)", "(PIP T3 W1 -> W0)")
+        # Offset the line numbers of one file
+        test = xdlrc(tiles).replace("# comment line\n", "# comment line\n\n")
+
+        serial = compare(test, correct)
+        self.assertFalse(serial[0])
+        self.assertGreater(serial[1], 0)
+        for text in (test, correct):
+            line_num = text.split("\n").index(
+                "\t\t(PIP T2 W0 -> W1_ROUTETHROUGH)") + 1
+            self.assertIn(f"line :{line_num} ", serial[3])
+        self.assertEqual(compare(test, correct, jobs=2), serial)
+
+    def test_parallel_extra_tile(self):
+        tiles = [tile(col) for col in range(NUM_TILES + 1)]
+        # The same TILES declaration as the correct file
+        test = xdlrc(tiles).replace(f"(TILES 1 {NUM_TILES + 1}\n",
+                                    f"(TILES 1 {NUM_TILES}\n")
+        correct = xdlrc()
+
+        parallel = compare(test, correct, jobs=2)
+        self.assertFalse(parallel[0])
+        self.assertEqual(parallel[1], 1)
+        self.assertIn(f"Unpaired tiles: T{NUM_TILES}", parallel[2])
+
+    def test_parallel_fatal_error(self):
+        tiles = [tile(col) for col in range(NUM_TILES)]
+        tiles[2] = tiles[2].replace("(WIRE W1 0)\n", "(CFG junk)\n")
+        test = xdlrc(tiles)
+        correct = xdlrc()
+
+        serial = compare(test, correct)
+        self.assertTrue(serial[0])
+        self.assertIn("build_tile_db() hit default branch", serial[2])
+
+        def timeout(signum, frame):
+            raise AssertionError("compare_xdlrc() did not terminate")
+
+        handler = signal.signal(signal.SIGALRM, timeout)
+        signal.alarm(60)
+        try:
+            parallel = compare(test, correct, jobs=2)
+        finally:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, handler)
+        self.assertEqual(parallel, serial)
+
+
+def parsed(*args, **kwargs):
+    """compare() with every tile and primitive_def parsed"""
+    with mock.patch.object(test_xdlrc, "skip_equal", return_value=None):
+        return compare(*args, **kwargs)
+
+
+class TestSkipEqualTiles(unittest.TestCase):
+    def test_skipped_tiles_match_parsed(self):
+        tiles = [tile(col) for col in range(NUM_TILES)]
+        tiles[1] = tiles[1].replace("internal", "unbonded").replace(
+            "W0 -> W1)", "W0 -> W1_ROUTETHROUGH)")
+        correct = xdlrc(tiles)
+        tiles[3] = tiles[3].replace("(CONN T0 W1)", "(CONN T0 W0)")
+        test = xdlrc(tiles)
+
+        skipped = compare(test, correct)
+        self.assertIn("PKG_SPECIFIC_EXCEPTION", skipped[3])
+        self.assertIn("ROUTETHROUGH_EXCEPTION", skipped[3])
+        self.assertGreater(skipped[1], 0)
+        self.assertEqual(parsed(test, correct), skipped)
+
+    def check_default_branch(self, body):
+        """A tile with body is parsed even if both files match"""
+        tiles = [tile(col) for col in range(NUM_TILES)]
+        tiles[1] = tile(1, body)
+        files = (xdlrc(tiles), xdlrc(tiles))
+
+        skipped = compare(*files)
+        self.assertTrue(skipped[0])
+        self.assertIn("build_tile_db() hit default branch", skipped[2])
+        self.assertEqual(parsed(*files), skipped)
+
+    def test_conn_after_pip(self):
+        self.check_default_branch("\t\t(WIRE W0 0)\n"
+                                  "\t\t(PIP T1 W0 -> W1)\n"
+                                  "\t\t\t(CONN T2 W1)\n")
+
+    def test_conn_after_site(self):
+        self.check_default_branch("\t\t(PRIMITIVE_SITE S1 SLICEL internal 0\n"
+                                  "\t\t)\n"
+                                  "\t\t\t(CONN T2 W1)\n")
+
+    def test_pinwire_without_site(self):
+        self.check_default_branch("\t\t(PINWIRE A input W0)\n"
+                                  "\t\t(WIRE W0 0)\n")
+
+    def test_pinwire_after_wire(self):
+        self.check_default_branch("\t\t(PRIMITIVE_SITE S1 SLICEL internal 1\n"
+                                  "\t\t)\n"
+                                  "\t\t(WIRE W0 0)\n"
+                                  "\t\t# comment line\n"
+                                  "\t\t(PINWIRE A input W0)\n")
+
+
+class TestSkipEqualPrimDefs(unittest.TestCase):
+    def test_cfg_elements_line_numbers(self):
+        correct = xdlrc()
+        # Offset the line numbers of one file
+        test = correct.replace("# comment line\n", "# comment line\n\n")
+
+        def cfg_elements(text):
+            """Line numbers of the elements without pins of each prim def"""
+            prim_defs = []
+            for i, line in enumerate(text.split("\n")):
+                if line.startswith("\t(PRIMITIVE_DEF "):
+                    prim_defs.append([])
+                elif re.match(r"\t\t\(ELEMENT \S+ 0\)?$", line):
+                    prim_defs[-1].append(f"caught on line {i + 1}")
+            return prim_defs
+
+        # Both files are reported for each primitive_def in turn
+        expected = [
+            line for lines1, lines2 in zip(
+                cfg_elements(test), cfg_elements(correct))
+            for line in lines1 + lines2
+        ]
+
+        with mock.patch.object(
+                test_xdlrc,
+                "build_prim_def_db",
+                wraps=test_xdlrc.build_prim_def_db) as build:
+            skipped = compare(test, correct)
+        build.assert_not_called()
+
+        reported = [
+            line.split("  ", 1)[1] for line in skipped[3].splitlines()
+            if line.startswith("CFG_ELEMENT_EXCEPTION")
+        ]
+        self.assertEqual(reported, expected)
+        self.assertEqual(parsed(test, correct), skipped)
+
+    def test_missing_prim_defs(self):
+        missing = ("\t(PRIMITIVE_DEF PDX 1 1\n\t\t(PIN A A input)\n"
+                   "\t\t(ELEMENT E0 0)\n\t)\n"
+                   "\t(PRIMITIVE_DEF PDY 0 0\n\t)\n")
+        prim_defs = PRIM_DEFS.replace("\t(PRIMITIVE_DEF PD1",
+                                      missing + "\t(PRIMITIVE_DEF PD1")
+        correct = xdlrc(prim_defs=prim_defs)
+        test = xdlrc()
+
+        skipped = compare(test, correct)
+        lines = correct.split("\n")
+        for name in ("PDX", "PDY"):
+            line_num = next(i for i, line in enumerate(lines, 1)
+                            if line.startswith(f"\t(PRIMITIVE_DEF {name} "))
+            self.assertIn(
+                f"caught on line {line_num}. PRIMITIVE_DEF {name} missing.",
+                skipped[3])
+        self.assertEqual(parsed(test, correct), skipped)
+
+    def check_default_branch(self, prim_def):
+        """A primitive_def is parsed even if both files match"""
+        prim_defs = PRIM_DEFS.replace("\t(PRIMITIVE_DEF PD1",
+                                      prim_def + "\t(PRIMITIVE_DEF PD1")
+        files = (xdlrc(prim_defs=prim_defs), xdlrc(prim_defs=prim_defs))
+
+        skipped = compare(*files)
+        self.assertEqual(skipped[1], 2)
+        self.assertIn("build_prim_def_db hit default branch", skipped[2])
+        self.assertEqual(parsed(*files), skipped)
+
+    def test_conn_before_element(self):
+        self.check_default_branch("\t(PRIMITIVE_DEF PDC 1 1\n"
+                                  "\t\t(PIN A A input)\n"
+                                  "\t\t(CONN E0 A ==> E1 A)\n"
+                                  "\t\t(ELEMENT E0 1\n"
+                                  "\t\t\t(PIN A input)\n"
+                                  "\t\t)\n"
+                                  "\t)\n")
+
+    def test_conn_after_cfg_element(self):
+        self.check_default_branch("\t(PRIMITIVE_DEF PDC 1 1\n"
+                                  "\t\t(PIN A A input)\n"
+                                  "\t\t(ELEMENT E0 0\n"
+                                  "\t\t\t(CFG #OFF #ON)\n"
+                                  "\t\t\t(CONN E0 A ==> E1 A)\n"
+                                  "\t\t)\n"
+                                  "\t)\n")